@@ -28,21 +28,22 @@ NUM_PREV_GAMES = 0
 
 class DataExtractor:
 
-  def getFactors(self):
+  def getFactors(self, allFactors):
     '''
     Decides which factors and statistics are going to be used based
     on the content of the offensive and defensive factor files.
     The offensiveStats and defensiveStats dictionaries map the
     names of statistics to their location in the game data.
+    If allFactors is set, every factor is used regardless of its flag.
     ''' 
     offensiveFile, defensiveFile = open('offensiveFactors'), open('defensiveFactors')
     index = 2
     offensiveFactors, defensiveFactors = dict(), dict()
     for oline,dline in zip(offensiveFile, defensiveFile):
       ofactor, dfactor = oline.split(','), dline.split(',')
-      if int(ofactor[1]) == 1:
+      if allFactors or int(ofactor[1]) == 1:
         self.offensiveStats[ofactor[0]] = index
-      if int(dfactor[1]) == 1:
+      if allFactors or int(dfactor[1]) == 1:
         self.defensiveStats[dfactor[0]] = index
       index += 1
     offensiveFile.close()
@@ -131,6 +132,23 @@ class DataExtractor:
     self.arrangeData(gameCode)
 
 
+  def getMatchupInput(self, firstTeam, secondTeam):
+    '''
+    Returns the input for a game between two teams that has not been
+    played yet, in the same form as the inputs of the featureDictionary:
+    a pair of dictionaries of the teams' average statistics through the
+    last game they played. Returns None if either team has not played
+    enough games for its averages to be used.
+    '''
+    input = list()
+    for teamCode in (firstTeam, secondTeam):
+      oldTeamData = self.teamDictionary.get(teamCode, list())
+      numPrevGames = len(oldTeamData)
+      if numPrevGames <= NUM_PREV_GAMES:
+        return None
+      input.append(self.averageStats(oldTeamData[numPrevGames - 1], numPrevGames))
+    return tuple(input)
+
   def getOrderedGameList(self, directory):
     '''
     Returns a list of games as they happen in chronological
@@ -153,10 +171,11 @@ class DataExtractor:
     file.close()
     return orderedGameList
 
-  def __init__(self, year):
+  def __init__(self, year, allFactors=False):
     '''
     Initializes the DataExtractor class. Constructs and fills the teamDictionary,
-    gameDictionary, and featureDictionary.
+    gameDictionary, and featureDictionary. If allFactors is set, the factor
+    files' flags are ignored and every statistic is extracted.
     '''
     self.teamDictionary = dict()
     self.gameDictionary = dict()
@@ -164,7 +183,7 @@ class DataExtractor:
     self.gameOrder = list()
     self.offensiveStats = dict()
     self.defensiveStats = dict()
-    self.getFactors()
+    self.getFactors(allFactors)
     directory = str(year) + '-data'
     file = open(directory + '/team-game-statistics.csv', 'r')
     for line in file:
@@ -0,0 +1,238 @@
+#
+# File: FeatureSelector.py
+#
+# --------------------------------------------------------
+#
+# This script searches for a good set of factors to turn on
+# in the offensiveFactors and defensiveFactors files, instead
+# of flipping the flags by hand and re-running everything.
+# Every season is extracted once with all of the factors on,
+# into a matrix with one column per feature (the same feature
+# names footballFeatureExtractor produces, ie. 'rush att-off1'),
+# which is cached on disk. A candidate set of factors is then
+# just a set of columns of that matrix, and it is evaluated by
+# training a logistic regression on those columns, starting
+# from the weights of the set it was grown from (or shrunk
+# from). Greedy forward selection adds the factor that most
+# lowers the validation loss at each step, and backward
+# elimination removes the factor whose removal lowers it most.
+# The resulting ranking can be written out as factor files.
+
+import sys
+import numpy as np
+import seasonCache
+from DataExtractor import DataExtractor
+
+# Constants
+BASE_FEATURES = ['wins-off', 'advantage']
+SIDES = ['off', 'def']
+
+def readFactorNames(path):
+  '''
+  Returns the names of the factors in a factor file, in file order.
+  '''
+  file = open(path, 'r')
+  names = [line.split(',')[0] for line in file if line.strip()]
+  file.close()
+  return names
+
+def loadSeasonMatrix(year):
+  '''
+  Returns (X, y, columns) for a season, where each row of X holds every
+  feature of a game with all of the factors turned on, y holds the
+  +1/-1 outcomes and columns holds the feature names. The matrix is
+  cached and rebuilt when the season's data is newer than the cache.
+  '''
+  path = seasonCache.getCachePath(year, 'features.npz')
+  if seasonCache.isFresh(path, year):
+    cached = np.load(path)
+    return cached['X'], cached['y'], list(cached['columns'])
+  examples = DataExtractor(year, allFactors=True).featureDictionary.values()
+  first = examples[0][0]
+  columns = sorted([stat + '1' for stat in first[0]] + [stat + '2' for stat in first[1]])
+  X = np.zeros((len(examples), len(columns)))
+  y = np.zeros(len(examples))
+  for i, ((team1, team2), output) in enumerate(examples):
+    for j, column in enumerate(columns):
+      X[i, j] = (team1 if column[-1] == '1' else team2)[column[:-1]]
+    y[i] = output
+  np.savez(path, X=X, y=y, columns=np.array(columns))
+  return X, y, columns
+
+class FeatureSelector:
+
+  def loadSeasons(self, seasons):
+    '''
+    Stacks the cached matrices of several seasons.
+    '''
+    matrices = [loadSeasonMatrix(year) for year in seasons]
+    columns = matrices[0][2]
+    for X, y, seasonColumns in matrices:
+      if seasonColumns != columns:
+        raise ValueError('Seasons were extracted with different factors')
+    return np.vstack([m[0] for m in matrices]), np.concatenate([m[1] for m in matrices]), columns
+
+  def getColumns(self, factors):
+    '''
+    Returns the matrix columns used by a set of factors, where a factor
+    is a (side, name) pair such as ('off', 'rush att'). The base features
+    are always included, and the bias is the last column.
+    '''
+    columns = list(self.baseColumns)
+    for factor in factors:
+      columns += self.factorColumns[factor]
+    return columns + [self.biasColumn]
+
+  def train(self, columns, weights=None):
+    '''
+    Trains a logistic regression on the given columns with full batch
+    gradient descent and returns the weights. If weights is given, it
+    maps columns to their starting weights, so that a set grown or shrunk
+    by one factor starts from the solution of the set it came from.
+    '''
+    X = self.trainX[:, columns]
+    w = np.array([weights.get(c, 0.0) for c in columns]) if weights else np.zeros(len(columns))
+    for iteration in range(self.numIterations):
+      margins = np.clip(X.dot(w) * self.trainY, -500, 500)
+      gradient = -X.T.dot(self.trainY / (1 + np.exp(margins))) / len(self.trainY)
+      w -= self.stepSize * (gradient + self.regularization * w)
+    return dict(zip(columns, w))
+
+  def evaluate(self, factors, weights=None):
+    '''
+    Trains on a set of factors and returns (validation loss, validation
+    error, weights), where the loss is the mean logistic loss.
+    '''
+    columns = self.getColumns(factors)
+    weights = self.train(columns, weights)
+    margins = self.validationX[:, columns].dot([weights[c] for c in columns]) * self.validationY
+    loss = np.logaddexp(0, -margins).mean()
+    error = (margins <= 0).mean()
+    return loss, error, weights
+
+  def forward(self, maxFactors):
+    '''
+    Greedy forward selection. Starting from only the base features, adds
+    the factor that gives the lowest validation loss until maxFactors
+    factors are chosen or no factor lowers the loss. Returns the ranked
+    list of (factor, validation loss, validation error) as they were added.
+    '''
+    selected, ranking = list(), list()
+    bestLoss, bestError, bestWeights = self.evaluate(selected)
+    self.report('base features', bestLoss, bestError)
+    while len(selected) < maxFactors:
+      candidates = [f for f in self.factors if f not in selected]
+      results = [(self.evaluate(selected + [f], bestWeights), f) for f in candidates]
+      if not results:
+        break
+      (loss, error, weights), factor = min(results, key=lambda result: result[0][0])
+      if loss >= bestLoss:
+        break
+      selected.append(factor)
+      ranking.append((factor, loss, error))
+      bestLoss, bestWeights = loss, weights
+      self.report('+ %s-%s' % (factor[1], factor[0]), loss, error)
+    return ranking
+
+  def backward(self, minFactors):
+    '''
+    Backward elimination. Starting from every factor, removes the factor
+    whose removal gives the lowest validation loss until minFactors are
+    left or every removal raises the loss. Returns the factors that were
+    kept, ranked by how much the validation loss rises without them, as
+    (factor, validation loss, validation error) without that factor.
+    '''
+    selected = list(self.factors)
+    bestLoss, bestError, bestWeights = self.evaluate(selected)
+    self.report('all factors', bestLoss, bestError)
+    while len(selected) > minFactors:
+      results = [(self.evaluate([f for f in selected if f != factor], bestWeights), factor) for factor in selected]
+      (loss, error, weights), factor = min(results, key=lambda result: result[0][0])
+      if loss >= bestLoss:
+        break
+      selected.remove(factor)
+      bestLoss, bestWeights = loss, weights
+      self.report('- %s-%s' % (factor[1], factor[0]), loss, error)
+    results = [(self.evaluate([f for f in selected if f != factor], bestWeights), factor) for factor in selected]
+    results.sort(key=lambda result: -result[0][0])
+    return [(factor, loss, error) for (loss, error, weights), factor in results]
+
+  def report(self, name, loss, error):
+    if self.verbose:
+      print "%-40s validation loss = %.4f, validation error = %.4f" % (name, loss, error)
+
+  def writeFactors(self, factors, offensivePath, defensivePath):
+    '''
+    Writes factor files in the format of offensiveFactors and
+    defensiveFactors, with the given factors turned on and every other
+    factor turned off.
+    '''
+    for side, path in zip(SIDES, (offensivePath, defensivePath)):
+      out = open(path, 'w')
+      for name in self.factorNames:
+        out.write('%s,%d\n' % (name, 1 if (side, name) in factors else 0))
+      out.close()
+
+  def __init__(self, trainSeasons, validationSeasons, numIterations=100, stepSize=0.5, regularization=0, verbose=0):
+    '''
+    Initializes the FeatureSelector class. Loads the cached matrices of
+    the training and validation seasons and standardizes their columns
+    with the training means and deviations, so that one step size works
+    for every set of factors.
+    '''
+    self.numIterations = numIterations
+    self.stepSize = stepSize
+    self.regularization = regularization
+    self.verbose = verbose
+    self.factorNames = readFactorNames('offensiveFactors')
+    self.trainX, self.trainY, columns = self.loadSeasons(trainSeasons)
+    self.validationX, self.validationY, validationColumns = self.loadSeasons(validationSeasons)
+    if validationColumns != columns:
+      raise ValueError('Seasons were extracted with different factors')
+    mean, deviation = self.trainX.mean(0), self.trainX.std(0)
+    deviation[deviation == 0] = 1
+    self.trainX = np.hstack([(self.trainX - mean) / deviation, np.ones((len(self.trainX), 1))])
+    self.validationX = np.hstack([(self.validationX - mean) / deviation, np.ones((len(self.validationX), 1))])
+    self.biasColumn = len(columns)
+    index = dict((column, i) for i, column in enumerate(columns))
+    self.baseColumns = [index[stat + team] for stat in BASE_FEATURES for team in '12']
+    self.factors = [(side, name) for side in SIDES for name in self.factorNames]
+    self.factorColumns = dict()
+    for side, name in self.factors:
+      self.factorColumns[(side, name)] = [index['%s-%s%s' % (name, side, team)] for team in '12']
+
+
+
+if __name__ == '__main__':
+  from commandLine import default, getParser, addTrainingSeasonOptions, parseOptions, parseSeasons
+  parser = getParser()
+  addTrainingSeasonOptions(parser)
+  parser.add_option('-d', '--direction', dest='direction', type='string',
+                    help=default('Which search to run (forward or backward)'), default='forward')
+  parser.add_option('-k', '--numFactors', dest='numFactors', type='int',
+                    help=default('Most factors to add going forward, or fewest to keep going backward'), default=20)
+  parser.add_option('-I', '--numIterations', dest='numIterations', type='int',
+                    help=default('Gradient descent iterations per candidate set'), default=100)
+  parser.add_option('-i', '--stepSize', dest='stepSize', type='float',
+                    help=default('Gradient descent step size'), default=0.5)
+  parser.add_option('-r', '--regularization', dest='regularization', type='float',
+                    help=default('The lambda in L2 regularization'), default=0)
+  parser.add_option('-o', '--offensiveFactors', dest='offensiveFactors', type='string',
+                    help=default('Where to write the selected offensive factors'), default='offensiveFactors.selected')
+  parser.add_option('-D', '--defensiveFactors', dest='defensiveFactors', type='string',
+                    help=default('Where to write the selected defensive factors'), default='defensiveFactors.selected')
+
+  options, extra_args = parseOptions(parser, sys.argv[1:])
+  selector = FeatureSelector(parseSeasons(options.trainSeasons), parseSeasons(options.validationSeasons),
+                             options.numIterations, options.stepSize, options.regularization, options.verbose)
+  if options.direction == 'forward':
+    ranking = selector.forward(options.numFactors)
+  elif options.direction == 'backward':
+    ranking = selector.backward(options.numFactors)
+  else:
+    print "Invalid search direction"
+    sys.exit(1)
+
+  for rank, (factor, loss, error) in enumerate(ranking):
+    print "%3d. %-30s validation loss = %.4f, validation error = %.4f" % (rank + 1, factor[1] + '-' + factor[0], loss, error)
+  selector.writeFactors([factor for factor, loss, error in ranking], options.offensiveFactors, options.defensiveFactors)
@@ -0,0 +1,255 @@
+#
+# File: HashedFeatures.py
+#
+# --------------------------------------------------------
+#
+# This script adds interaction features (which two teams are
+# playing, a team's conference crossed with each of its stats,
+# and home field crossed with each stat) without letting the
+# feature space grow without bound. Every feature name, raw or
+# crossed, is hashed into a fixed space of 2^numBits indices,
+# so an example becomes a pair of sparse arrays of indices and
+# values, and the weights are a single NumPy array of that
+# size. Memory for the weights is fixed no matter how many
+# teams, conferences or crosses there are, and a dot product
+# only touches the example's own indices.
+# The inputs are the usual (team1, team2) pairs of average
+# stats, optionally with a third element holding the context
+# of the game (the team codes, conferences and home field),
+# which getContextExamples builds from a season's data.
+
+import sys, math, random, zlib
+import numpy as np
+import util
+from seasonData import readTeams
+from DataExtractor import DataExtractor
+
+# Constants
+NUM_BITS = 18
+# The sign of a hashed feature is bit 31 of its hash, so the index can
+# use at most the 30 bits below it without the two overlapping.
+MAX_BITS = 30
+MAX_MARGIN = 500
+# The smallest lazy weight scale before it is folded into the weights.
+MIN_SCALE = 1e-9
+
+def hashFeature(name, numBits):
+  '''
+  Returns the (index, sign) of a feature name in a space of 2^numBits
+  indices. The sign comes from a bit of the hash that is not part of
+  the index, so that colliding features tend to cancel rather than add.
+  '''
+  h = zlib.crc32(name) & 0xffffffff
+  return h & ((1 << numBits) - 1), 1.0 if h >> 31 else -1.0
+
+def readContexts(year):
+  '''
+  Returns dictionaries from team codes to conference codes, from
+  team.csv, and from game codes to whether the game was played at one
+  of the teams' home field, from game.csv.
+  '''
+  teamConferences = readTeams(year)[1]
+  homeGames = dict()
+  file = open(str(year) + '-data/game.csv', 'r')
+  for line in file:
+    gameData = line.rstrip('\r\n').split(',')
+    if gameData[0][0] == '"':
+      continue
+    homeGames[gameData[0]] = gameData[len(gameData) - 1] == 'TEAM'
+  file.close()
+  return teamConferences, homeGames
+
+def getContextExamples(year):
+  '''
+  Returns a season's examples with the context of each game added to
+  its input, ie. ((team1, team2, context), output), where context holds
+  the 'teams' and 'conferences' of the first and second team and 'home',
+  which is 1 for the team playing at home. The first team of an input
+  is the visiting team, so the second team is at home unless the game
+  was played at a neutral site.
+  '''
+  extractor = DataExtractor(year)
+  teamConferences, homeGames = readContexts(year)
+  examples = list()
+  for gameCode, (input, output) in extractor.featureDictionary.items():
+    teams = tuple(teamData[0] for teamData in extractor.gameDictionary[gameCode])
+    context = {'teams': teams,
+               'conferences': tuple(teamConferences.get(team, 'none') for team in teams),
+               'home': (0, 1) if homeGames.get(gameCode) else (0, 0)}
+    examples.append(((input[0], input[1], context), output))
+  return examples
+
+class HashedFeatureExtractor:
+
+  def getFeatures(self, x):
+    '''
+    Returns the named features of an input as a list of (name, value)
+    pairs, before hashing. The raw stats are named as they are by
+    footballFeatureExtractor, ie. 'rush yard-off1'.
+    '''
+    features = list()
+    teamStats = x[:2]
+    context = x[2] if len(x) > 2 else None
+    for side, stats in enumerate(teamStats):
+      suffix = str(side + 1)
+      for stat, val in stats.items():
+        features.append((stat + suffix, val))
+        if context is None:
+          continue
+        if self.crossConferences:
+          features.append(('conf' + context['conferences'][side] + ':' + stat + suffix, val))
+        if self.crossHome and context['home'][side]:
+          features.append(('home:' + stat + suffix, val))
+    if context is not None and self.crossTeams:
+      features.append(('pair:%s@%s' % context['teams'], 1))
+      for side, team in enumerate(context['teams']):
+        features.append(('team%d:%s' % (side + 1, team), 1))
+    return features
+
+  def __call__(self, x):
+    '''
+    Returns the hashed features of an input as an array of indices and
+    an array of values. An index can appear more than once when two
+    features collide, which the learner's sums take care of.
+    '''
+    features = self.getFeatures(x)
+    indices = np.empty(len(features), dtype=np.int64)
+    values = np.empty(len(features))
+    for i, (name, value) in enumerate(features):
+      indices[i], sign = hashFeature(name, self.numBits)
+      values[i] = sign * value
+    return indices, values
+
+  def __init__(self, numBits=NUM_BITS, crossTeams=True, crossConferences=True, crossHome=True):
+    if numBits > MAX_BITS:
+      raise ValueError('numBits must be at most %d, so that the index and sign bits of a hash do not overlap' % MAX_BITS)
+    self.numBits = numBits
+    self.crossTeams = crossTeams
+    self.crossConferences = crossConferences
+    self.crossHome = crossHome
+
+"""
+The derivatives of the losses in learning.py with respect to the margin
+(weights*featureVector), for a given label y. Multiplying one by the
+feature values gives the gradient of that loss.
+"""
+def logisticLossDerivative(margin, y):
+  return -y/(1 + math.exp(max(min(margin*y, MAX_MARGIN), -MAX_MARGIN)))
+
+def hingeLossDerivative(margin, y):
+  return -y if margin*y < 1 else 0
+
+def squaredLossDerivative(margin, y):
+  return margin - y
+
+LOSS_DERIVATIVES = {'logistic': logisticLossDerivative, 'hinge': hingeLossDerivative,
+                    'squared': squaredLossDerivative}
+
+class HashedStochasticGradientLearner:
+  def __init__(self, featureExtractor):
+    self.featureExtractor = featureExtractor
+    self.weights = np.zeros(1 << featureExtractor.numBits)
+    self.scale = 1.0
+    self.numUpdates = 0
+
+  def margin(self, indices, values):
+    return self.scale * self.weights[indices].dot(values)
+
+  def foldScale(self):
+    '''
+    Multiplies the lazy scale into the weights, so that self.weights
+    holds the actual weights again.
+    '''
+    if self.scale != 1.0:
+      self.weights *= self.scale
+      self.scale = 1.0
+
+  def update(self, indices, values, y, lossDerivative, options, numExamples):
+    '''
+    Makes one stochastic gradient update on a hashed example. Only the
+    example's indices change: the shrinking of every weight by L2
+    regularization is kept as a scalar scale of the weights, which is
+    folded into them at the end of a round (or once it gets too small),
+    so an update costs the same whatever the size of the hashed space.
+    '''
+    self.numUpdates += 1
+    stepSize = options.initStepSize/(self.numUpdates**options.stepSizeReduction)
+    if options.regularization != 0:
+      self.scale *= 1 - options.regularization/float(numExamples)
+      if self.scale < MIN_SCALE:
+        self.foldScale()
+    np.add.at(self.weights, indices, -stepSize*lossDerivative(self.margin(indices, values), y)*values/self.scale)
+
+  """
+  Learns the weights with stochastic gradient descent, in the same way as
+  StochasticGradientLearner.learn, printing the train and validation error
+  after each round. The features are not memoized by id: hashing an
+  example is cheap next to a stale entry for a freed input whose id has
+  been reused.
+  @param lossDerivative: one of the LOSS_DERIVATIVES.
+  @param options: the same parameters of the algorithm as for learn.
+  """
+  def learn(self, trainExamples, validationExamples, lossDerivative, options):
+    self.weights[:] = 0
+    self.scale = 1.0
+    random.seed(42)
+    for round in range(0, options.numRounds):
+      random.shuffle(trainExamples)
+      self.numUpdates = 0
+      for x, y in trainExamples:
+        indices, values = self.featureExtractor(x)
+        self.update(indices, values, y, lossDerivative, options, len(trainExamples))
+      self.foldScale()
+      trainError = util.getClassificationErrorRate(trainExamples, self.predict)
+      validationError = util.getClassificationErrorRate(validationExamples, self.predict)
+      print "Round %s/%s: train error = %.4f, validation error = %.4f, nonzero weights = %d" % (round+1, options.numRounds, trainError, validationError, np.count_nonzero(self.weights))
+
+  """
+  Makes stochastic gradient updates on a batch of streamed examples, as
+  StochasticGradientLearner.partialFit does.
+  """
+  def partialFit(self, examples, lossDerivative, options, numExamples):
+    for x, y in examples:
+      indices, values = self.featureExtractor(x)
+      self.update(indices, values, y, lossDerivative, options, numExamples)
+    self.foldScale()
+
+  def predict(self, x):
+    if self.margin(*self.featureExtractor(x)) > 0:
+      return 1
+    else:
+      return -1
+
+  def predictProbability(self, x):
+    margin = max(min(self.margin(*self.featureExtractor(x)), MAX_MARGIN), -MAX_MARGIN)
+    return 1.0/(1 + math.exp(-margin))
+
+
+
+if __name__ == '__main__':
+  from commandLine import default, getParser, addTrainingSeasonOptions, addLossOption, addLearnerOptions, parseOptions, parseSeasons
+  parser = getParser()
+  addTrainingSeasonOptions(parser)
+  parser.add_option('-b', '--numBits', dest='numBits', type='int',
+                    help=default('Number of bits of the hashed feature space'), default=NUM_BITS)
+  parser.add_option('-x', '--noCrosses', dest='crosses', action='store_false',
+                    help='Only use the raw stats, without the crossed features', default=True)
+  addLossOption(parser)
+  addLearnerOptions(parser)
+
+  options, extra_args = parseOptions(parser, sys.argv[1:])
+  if options.loss not in LOSS_DERIVATIVES:
+    print "Invalid loss function"
+    sys.exit(1)
+  if options.numBits > MAX_BITS:
+    print "The number of bits can be at most", MAX_BITS
+    sys.exit(1)
+
+  train, validation = list(), list()
+  for year in parseSeasons(options.trainSeasons):
+    train += getContextExamples(year)
+  for year in parseSeasons(options.validationSeasons):
+    validation += getContextExamples(year)
+  extractor = HashedFeatureExtractor(options.numBits, options.crosses, options.crosses, options.crosses)
+  learner = HashedStochasticGradientLearner(extractor)
+  learner.learn(train, validation, LOSS_DERIVATIVES[options.loss], options)
@@ -0,0 +1,184 @@
+#
+# File: PlayIndex.py
+#
+# --------------------------------------------------------
+#
+# This script builds a single index of every play of a season,
+# out of the separate play tables (rush.csv, pass.csv, and so
+# forth), which all share the Game Code and Play Number columns.
+# Each table is sorted by (game code, play number) and the
+# sorted tables are k-way merged into one sequence, which is
+# stored as a compact binary array of fixed size records, along
+# with the offset of each game's first play. Loading the index
+# memory maps the array, so any game's plays, in order, are a
+# slice found in constant time. The period (quarter) of each
+# play is not in the play tables, so it is taken from the
+# drives in drive.csv, by walking a game's rushes and passes
+# through its drives in order.
+
+import heapq, itertools
+import numpy as np
+import seasonCache
+
+# Constants
+PLAY_TABLES = ['rush', 'pass', 'reception', 'punt', 'kickoff', 'punt-return', 'kickoff-return']
+OFFENSIVE_TABLES = [PLAY_TABLES.index('rush'), PLAY_TABLES.index('pass')]
+# Columns of the player code, yards, touchdown, first down and turnover
+# flags in each play table, or None if the table has no such column.
+TABLE_COLUMNS = {
+  'rush': (3, 5, 6, 7, 10),
+  'pass': (3, 7, 8, 10, 9),
+  'reception': (3, 5, 6, 7, 9),
+  'punt': (3, 5, None, None, None),
+  'kickoff': (3, 5, None, None, None),
+  'punt-return': (3, 5, 6, None, 8),
+  'kickoff-return': (3, 5, 6, None, 8),
+}
+PLAY_TYPE = np.dtype([('play', np.uint16), ('table', np.uint8), ('period', np.uint8),
+                      ('team', np.uint16), ('player', np.int32), ('yards', np.int16),
+                      ('touchdown', np.uint8), ('firstDown', np.uint8), ('turnover', np.uint8)])
+
+def toInt(field):
+  '''
+  Converts a csv field to an int, treating an empty field as 0.
+  '''
+  field = field.strip()
+  return int(field) if field else 0
+
+def readPlayTable(directory, table):
+  '''
+  Returns the plays of one table as a list of (game code, play number,
+  table, team, player, yards, touchdown, first down, turnover) tuples,
+  sorted by game code and play number.
+  '''
+  tableId = PLAY_TABLES.index(table)
+  columns = TABLE_COLUMNS[table]
+  plays = list()
+  file = open(directory + '/' + table + '.csv', 'r')
+  for line in file:
+    playData = line.split(',')
+    if playData[0][0] == '"':
+      continue
+    plays.append((playData[0], toInt(playData[1]), tableId, toInt(playData[2])) +
+                 tuple(0 if column is None else toInt(playData[column]) for column in columns))
+  file.close()
+  plays.sort()
+  return plays
+
+def readDrives(directory):
+  '''
+  Returns a dictionary from game codes to the game's drives, in order,
+  as (team, start period, end period, number of plays) tuples.
+  '''
+  drives = dict()
+  file = open(directory + '/drive.csv', 'r')
+  for line in file:
+    driveData = line.split(',')
+    if driveData[0][0] == '"':
+      continue
+    drives.setdefault(driveData[0], list()).append((toInt(driveData[1]), toInt(driveData[2]),
+                                                    toInt(driveData[3]), toInt(driveData[7]), toInt(driveData[11])))
+  file.close()
+  for gameCode in drives:
+    drives[gameCode] = [drive[1:] for drive in sorted(drives[gameCode])]
+  return drives
+
+def assignPeriods(plays, drives):
+  '''
+  Returns the periods of a game's plays, given as (table, team) pairs
+  in order, from the game's drives. Rushes and passes are walked through
+  the drives in order: a play moves on to the next drive of its team
+  when the team changes, or when the current drive has used up its plays
+  and the next drive is the same team's. A drive that spans two periods
+  gives its later plays the later period. Every other play (kicks and
+  returns) takes the period of the last rush or pass before it.
+  '''
+  periods = list()
+  driveIndex, used, period = 0, 0, 1
+  for table, playTeam in plays:
+    if drives and table in OFFENSIVE_TABLES:
+      team, startPeriod, endPeriod, numPlays = drives[driveIndex]
+      if team != playTeam or (used >= numPlays and driveIndex + 1 < len(drives) and drives[driveIndex + 1][0] == team):
+        nextIndex = driveIndex + 1
+        while nextIndex < len(drives) and drives[nextIndex][0] != playTeam:
+          nextIndex += 1
+        if nextIndex < len(drives):
+          driveIndex, used = nextIndex, 0
+          team, startPeriod, endPeriod, numPlays = drives[driveIndex]
+      period = min(endPeriod, startPeriod + (endPeriod - startPeriod + 1) * used / max(numPlays, 1))
+      used += 1
+    periods.append(period)
+  return periods
+
+def buildPlayIndex(year, playsPath, offsetsPath):
+  '''
+  Builds a season's play index and writes it to playsPath (the play
+  records) and offsetsPath (the sorted game codes, and the offset of
+  each game's first play, with the total number of plays at the end).
+  '''
+  directory = str(year) + '-data'
+  merged = heapq.merge(*[readPlayTable(directory, table) for table in PLAY_TABLES])
+  drives = readDrives(directory)
+  records, gameCodes, offsets = list(), list(), list()
+  for gameCode, gamePlays in itertools.groupby(merged, lambda play: play[0]):
+    gamePlays = list(gamePlays)
+    periods = assignPeriods([play[2:4] for play in gamePlays], drives.get(gameCode, list()))
+    gameCodes.append(gameCode)
+    offsets.append(len(records))
+    records += [play[1:3] + (period,) + play[3:] for play, period in zip(gamePlays, periods)]
+  offsets.append(len(records))
+  plays = np.array(records, dtype=PLAY_TYPE)
+  np.save(playsPath, plays)
+  np.savez(offsetsPath, gameCodes=np.array(gameCodes), offsets=np.array(offsets, dtype=np.int64))
+
+class PlayIndex:
+
+  def getPlays(self, gameCode):
+    '''
+    Returns a game's plays, in order, as an array of PLAY_TYPE records,
+    ie. getPlays(gameCode)['yards'] is the yards gained on each play.
+    '''
+    i = self.gameIndex[gameCode]
+    return self.plays[self.offsets[i]:self.offsets[i + 1]]
+
+  def getSuccessRateByPeriod(self, gameCode=None, teamCode=None):
+    '''
+    Returns a dictionary from periods to the success rate of the rushes
+    and passes run in them, over one game or the whole season, and for
+    one team or every team. A play is a success if it gained a first
+    down or scored a touchdown.
+    '''
+    plays = self.plays if gameCode is None else self.getPlays(gameCode)
+    mask = np.in1d(plays['table'], OFFENSIVE_TABLES)
+    if teamCode is not None:
+      mask &= plays['team'] == int(teamCode)
+    plays = plays[mask]
+    success = (plays['firstDown'] > 0) | (plays['touchdown'] > 0)
+    attempts = np.bincount(plays['period'])
+    successes = np.bincount(plays['period'], weights=success)
+    return dict((period, successes[period] / attempts[period]) for period in range(len(attempts)) if attempts[period])
+
+  def __init__(self, year):
+    '''
+    Initializes the PlayIndex class. Builds the season's play index if
+    it is missing or out of date, and memory maps it.
+    '''
+    directory = str(year) + '-data'
+    playsPath = seasonCache.getCachePath(year, 'plays.npy')
+    offsetsPath = seasonCache.getCachePath(year, 'playOffsets.npz')
+    sources = [directory + '/' + table + '.csv' for table in PLAY_TABLES + ['drive']]
+    if not (seasonCache.isFresh(playsPath, year, sources) and seasonCache.isFresh(offsetsPath, year, sources)):
+      buildPlayIndex(year, playsPath, offsetsPath)
+    self.plays = np.load(playsPath, mmap_mode='r')
+    offsets = np.load(offsetsPath)
+    self.offsets = offsets['offsets']
+    self.gameIndex = dict((gameCode, i) for i, gameCode in enumerate(offsets['gameCodes']))
+
+
+
+if __name__ == '__main__':
+  playIndex = PlayIndex(12)
+  plays = playIndex.getPlays('0128000520120830')
+  for play in plays[:10]:
+    print PLAY_TABLES[play['table']], play
+  print playIndex.getSuccessRateByPeriod()
@@ -0,0 +1,215 @@
+#
+# File: SeasonGenerator.py
+#
+# --------------------------------------------------------
+#
+# This script writes synthetic seasons of data in the same
+# format as the real N-data directories, so that the
+# DataExtractor and the learners can be benchmarked at many
+# times the volume of the real data.
+# Every synthetic game is built by resampling a whole real
+# game (both teams' rows of team-game-statistics.csv, plus its
+# drives and plays), which keeps the stat distributions and the
+# correlations between the two teams' stats realistic. The
+# synthetic teams are given a hidden strength, and the stronger
+# team is more likely to be assigned the winning side of the
+# resampled game, so that there is still something to learn.
+# Synthetic seasons default to numbers >= 100 so that they can
+# never clobber the real 5-data ... 12-data directories.
+
+import os, sys, random, math, datetime
+
+# Constants
+PLAY_TABLES = ['drive', 'rush', 'pass', 'reception', 'punt',
+               'punt-return', 'kickoff', 'kickoff-return']
+HOME_ADVANTAGE = 0.3
+FIRST_WEEK = (8, 30)
+
+class SeasonGenerator:
+
+  def readHeader(self, path):
+    '''
+    Returns the header line of a csv file.
+    '''
+    file = open(path, 'r')
+    header = file.readline()
+    file.close()
+    return header
+
+  def loadReferenceSeason(self, year):
+    '''
+    Reads one real season into the reference tables. Only games
+    for which both teams have a row and the game has a winner
+    can be resampled, so every other game is ignored. The rows
+    are kept as split lines, the last element still holding the
+    line ending, so that they can be written back out untouched.
+    The real files end their lines with \r\n, as do the rows
+    written from scratch, which the DataExtractor relies on to
+    find the games played at a home field.
+    '''
+    directory = str(year) + '-data'
+    gameRows = dict()
+    file = open(directory + '/team-game-statistics.csv', 'r')
+    for line in file:
+      gameData = line.split(',')
+      if gameData[0][0] == '"':
+        continue
+      gameRows.setdefault(gameData[1], list()).append(gameData)
+    file.close()
+    for gameCode, rows in gameRows.items():
+      if len(rows) != 2 or int(rows[0][35]) == int(rows[1][35]):
+        continue
+      if int(rows[0][35]) < int(rows[1][35]):
+        rows.reverse()
+      self.referenceGames.append(gameCode)
+      self.teamGameRows[gameCode] = rows
+    file = open(directory + '/game-statistics.csv', 'r')
+    for line in file:
+      gameData = line.split(',', 1)
+      if gameData[0][0] == '"':
+        continue
+      self.gameStatisticsRows[gameData[0]] = gameData[1]
+    file.close()
+    if not self.includePlays:
+      return
+    for table in PLAY_TABLES:
+      plays = self.playRows[table]
+      file = open(directory + '/' + table + '.csv', 'r')
+      for line in file:
+        playData = line.split(',', 3)
+        if playData[0][0] == '"':
+          continue
+        plays.setdefault(playData[0], list()).append(playData)
+      file.close()
+
+  def buildSchedule(self, numTeams, gamesPerTeam):
+    '''
+    Returns a list of weeks, each of which is a list of
+    (visiting team, home team) pairs. Every week the teams are
+    shuffled and paired off, so each team plays once a week and
+    gamesPerTeam weeks are played. With an odd number of teams,
+    one team has a bye each week.
+    '''
+    teams = range(1, numTeams + 1)
+    schedule = list()
+    for week in range(gamesPerTeam):
+      random.shuffle(teams)
+      schedule.append([(teams[i], teams[i + 1]) for i in range(0, len(teams) - 1, 2)])
+    return schedule
+
+  def writeGame(self, files, gameCode, date, visitor, home):
+    '''
+    Resamples a real game and writes it out as the game between
+    visitor and home. The winner is drawn from the teams' hidden
+    strengths, and the real game's winning side is given to it.
+    '''
+    strength = self.strengths[home] - self.strengths[visitor] + HOME_ADVANTAGE
+    if random.random() < 1.0 / (1 + math.exp(-strength)):
+      winner, loser = home, visitor
+    else:
+      winner, loser = visitor, home
+    referenceCode = random.choice(self.referenceGames)
+    winnerRow, loserRow = self.teamGameRows[referenceCode]
+    teamCodes = {winnerRow[0]: str(winner), loserRow[0]: str(loser)}
+    files['game'].write('%s,%s,%d,%d,%d,TEAM\r\n' % (gameCode, date.strftime('%m/%d/%Y'), visitor, home, home))
+    for row in (winnerRow, loserRow):
+      files['team-game-statistics'].write(','.join([teamCodes[row[0]], gameCode] + row[2:]))
+    if referenceCode in self.gameStatisticsRows:
+      files['game-statistics'].write(gameCode + ',' + self.gameStatisticsRows[referenceCode])
+    if not self.includePlays:
+      return
+    for table in PLAY_TABLES:
+      out = files[table]
+      for playData in self.playRows[table].get(referenceCode, ()):
+        out.write(','.join([gameCode, playData[1], teamCodes.get(playData[2], playData[2]), playData[3]]))
+
+  def generateSeason(self, year, numTeams, gamesPerTeam, numConferences):
+    '''
+    Writes a synthetic season to the directory year-data. The
+    files are written as the games are generated, so memory use
+    does not depend on the size of the season. Team codes are
+    1 ... numTeams, and the teams are dealt round-robin into
+    numConferences conferences.
+    '''
+    directory = str(year) + '-data'
+    if os.path.exists(directory):
+      raise ValueError('Refusing to overwrite existing directory ' + directory)
+    if numTeams > 9999:
+      raise ValueError('Team codes must fit in the four digits of a game code')
+    os.mkdir(directory)
+    self.strengths = dict((team, random.gauss(0, 1)) for team in range(1, numTeams + 1))
+
+    out = open(directory + '/conference.csv', 'w')
+    out.write(self.headers['conference'])
+    for conference in range(1, numConferences + 1):
+      out.write('%d,"Synthetic Conference %d","FBS"\r\n' % (conference, conference))
+    out.close()
+    out = open(directory + '/team.csv', 'w')
+    out.write(self.headers['team'])
+    for team in range(1, numTeams + 1):
+      out.write('%d,"Synthetic Team %d",%d\r\n' % (team, team, (team - 1) % numConferences + 1))
+    out.close()
+
+    tables = ['game', 'team-game-statistics', 'game-statistics']
+    if self.includePlays:
+      tables += PLAY_TABLES
+    files = dict()
+    for table in tables:
+      files[table] = open(directory + '/' + table + '.csv', 'w')
+      files[table].write(self.headers[table])
+    firstWeek = datetime.date(2000 + year, FIRST_WEEK[0], FIRST_WEEK[1])
+    for week, games in enumerate(self.buildSchedule(numTeams, gamesPerTeam)):
+      date = firstWeek + datetime.timedelta(weeks=week)
+      for visitor, home in games:
+        gameCode = '%04d%04d%s' % (visitor, home, date.strftime('%Y%m%d'))
+        self.writeGame(files, gameCode, date, visitor, home)
+    for file in files.values():
+      file.close()
+
+  def __init__(self, referenceSeasons, includePlays=True, seed=None):
+    '''
+    Initializes the SeasonGenerator class. Loads the real seasons
+    listed in referenceSeasons, which are the games that every
+    synthetic game is resampled from.
+    '''
+    random.seed(seed)
+    self.includePlays = includePlays
+    self.referenceGames = list()
+    self.teamGameRows = dict()
+    self.gameStatisticsRows = dict()
+    self.playRows = dict((table, dict()) for table in PLAY_TABLES)
+    self.strengths = dict()
+    self.headers = dict()
+    directory = str(referenceSeasons[0]) + '-data'
+    for table in ['conference', 'team', 'game', 'team-game-statistics', 'game-statistics'] + PLAY_TABLES:
+      self.headers[table] = self.readHeader(directory + '/' + table + '.csv')
+    for year in referenceSeasons:
+      self.loadReferenceSeason(year)
+
+
+
+if __name__ == '__main__':
+  from commandLine import default, getParser, parseOptions, parseSeasons
+  parser = getParser()
+  parser.add_option('-y', '--firstSeason', dest='firstSeason', type='int',
+                    help=default('Number of the first synthetic season (written to <n>-data)'), default=100)
+  parser.add_option('-n', '--numSeasons', dest='numSeasons', type='int',
+                    help=default('Number of synthetic seasons to write'), default=1)
+  parser.add_option('-t', '--numTeams', dest='numTeams', type='int',
+                    help=default('Number of teams per season'), default=240)
+  parser.add_option('-g', '--gamesPerTeam', dest='gamesPerTeam', type='int',
+                    help=default('Number of games played by each team'), default=12)
+  parser.add_option('-c', '--numConferences', dest='numConferences', type='int',
+                    help=default('Number of conferences the teams are split into'), default=12)
+  parser.add_option('-r', '--referenceSeasons', dest='referenceSeasons', type='string',
+                    help=default('Comma separated real seasons to resample games from'), default='12')
+  parser.add_option('-p', '--noPlays', dest='includePlays', action='store_false',
+                    help='Only write the game level tables, not the drive and play tables', default=True)
+  parser.add_option('-s', '--seed', dest='seed', type='int',
+                    help=default('Random seed'), default=42)
+
+  options, extra_args = parseOptions(parser, sys.argv[1:])
+  generator = SeasonGenerator(parseSeasons(options.referenceSeasons), options.includePlays, options.seed)
+  for year in range(options.firstSeason, options.firstSeason + options.numSeasons):
+    generator.generateSeason(year, options.numTeams, options.gamesPerTeam, options.numConferences)
+    print "Wrote %d-data" % year
@@ -0,0 +1,253 @@
+#
+# File: SeasonSimulator.py
+#
+# --------------------------------------------------------
+#
+# This script simulates the rest of a season many times over,
+# to get probabilities for each team's final number of wins
+# and for who finishes on top of each conference, which is
+# decided by wins in games between members of the conference.
+# The games still to be played are the games listed in
+# gameUNPLAYED.csv that do not appear in the season's
+# game.csv. A trained learner gives the probability that the
+# visiting team wins each of them, from the teams' average
+# statistics so far, and every simulation draws all of the
+# remaining games at once. The simulations are run in chunks
+# of NumPy draws, optionally split across a pool of
+# processes, and only the aggregated counts are kept.
+
+import sys
+import numpy as np
+from multiprocessing import Pool
+from learning import *
+from seasonData import readTeams, readConferences, readUnplayedGames
+from DataExtractor import DataExtractor
+
+# Constants
+CHUNK_SIZE = 10000
+INDEPENDENT_CONFERENCES = ['Independent', 'Ind']
+
+def simulateWins(args):
+  '''
+  Runs numSimulations simulations of the unplayed games and returns
+  the aggregated results as a pair of arrays: the number of times each
+  team finished with each win total (numTeams by maxWins + 1) and the
+  number of times each team finished first in its conference, by wins
+  in conference games, where a tie for first gives each of the tied
+  teams an equal share.
+  Each row of the draws is one simulated season, so the win totals of
+  a whole chunk of seasons are a single matrix product with the
+  matrix mapping game outcomes to teams, and the conference win totals
+  are the same product with only the rows of the conference games.
+  '''
+  probabilities, gameTeams, currentWins, conferenceGames, currentConferenceWins, conferences, numSimulations, seed = args
+  random = np.random.RandomState(seed)
+  numTeams, maxWins = len(currentWins), int((currentWins + np.abs(gameTeams).sum(0)).max())
+  baseWins = currentWins + (gameTeams < 0).sum(0)
+  conferenceGameTeams = gameTeams * conferenceGames[:, np.newaxis]
+  baseConferenceWins = currentConferenceWins + (conferenceGameTeams < 0).sum(0)
+  winCounts = np.zeros(numTeams * (maxWins + 1), dtype=np.int64)
+  championships = np.zeros(numTeams)
+  offsets = np.arange(numTeams) * (maxWins + 1)
+  for start in range(0, numSimulations, CHUNK_SIZE):
+    numDraws = min(CHUNK_SIZE, numSimulations - start)
+    visitorWins = (random.random_sample((numDraws, len(probabilities))) < probabilities).astype(np.float32)
+    wins = (baseWins + visitorWins.dot(gameTeams)).round().astype(np.int64)
+    winCounts += np.bincount((wins + offsets).ravel(), minlength=len(winCounts))
+    conferenceWins = baseConferenceWins + visitorWins.dot(conferenceGameTeams)
+    for teams in conferences:
+      conferenceTeamWins = conferenceWins[:, teams]
+      leaders = conferenceTeamWins == conferenceTeamWins.max(1)[:, np.newaxis]
+      championships[teams] += (leaders / leaders.sum(1, dtype=np.float64)[:, np.newaxis]).sum(0)
+  return winCounts.reshape(numTeams, maxWins + 1), championships
+
+class SeasonSimulator:
+
+  def getTeamIndex(self, teamCode):
+    '''
+    Returns the column of a team in the simulation arrays, adding the
+    team if it has not been seen yet.
+    '''
+    if teamCode not in self.teamIndex:
+      self.teamIndex[teamCode] = len(self.teamCodes)
+      self.teamCodes.append(teamCode)
+    return self.teamIndex[teamCode]
+
+  def getConference(self, teamCode):
+    '''
+    Returns the conference code of a team, or None if the team is an
+    independent or is missing from team.csv.
+    '''
+    conference = self.teamConferences.get(teamCode)
+    if self.conferenceNames.get(conference) in INDEPENDENT_CONFERENCES:
+      return None
+    return conference
+
+  def isConferenceGame(self, firstTeam, secondTeam):
+    '''
+    Returns whether a game between two team codes is a conference game,
+    ie. both teams are members of the same conference.
+    '''
+    conference = self.getConference(firstTeam)
+    return conference is not None and conference == self.getConference(secondTeam)
+
+  def getPlayedGames(self):
+    '''
+    Lists the (winner, loser) pairs of the games that have already been
+    played, from the extractor's gameDictionary, in record, and of the
+    conference games among them in conferenceRecord.
+    '''
+    for gameCode, gameData in self.extractor.gameDictionary.items():
+      if len(gameData) != 2:
+        continue
+      firstTeam, secondTeam = self.getTeamIndex(gameData[0][0]), self.getTeamIndex(gameData[1][0])
+      if int(gameData[0][35]) > int(gameData[1][35]):
+        result = (firstTeam, secondTeam)
+      elif int(gameData[0][35]) < int(gameData[1][35]):
+        result = (secondTeam, firstTeam)
+      else:
+        continue
+      self.record.append(result)
+      if self.isConferenceGame(gameData[0][0], gameData[1][0]):
+        self.conferenceRecord.append(result)
+
+  def getWinProbabilities(self, learner):
+    '''
+    Uses the learner to find the probability that the visiting team
+    wins each unplayed game. Games involving a team without any
+    statistics yet are given even odds.
+    '''
+    probabilities = list()
+    for gameCode, visitor, home in self.unplayedGames:
+      input = self.extractor.getMatchupInput(visitor, home)
+      probabilities.append(0.5 if input is None else learner.predictProbability(input))
+    return np.array(probabilities)
+
+  def simulate(self, numSimulations, numProcesses=1, seed=42):
+    '''
+    Simulates the rest of the season numSimulations times, split evenly
+    across numProcesses processes, and sets winDistribution (the
+    probability of each team finishing with each number of wins),
+    expectedWins, expectedConferenceWins and conferenceChampion (the
+    probability of each team finishing first in its conference by
+    conference wins, sharing ties). Only conferences that play conference
+    games have a champion, which leaves out the independents, and the
+    FCS conferences, whose games against each other are not in the data.
+    '''
+    numTeams = len(self.teamCodes)
+    currentWins, currentConferenceWins = np.zeros(numTeams), np.zeros(numTeams)
+    for winner, loser in self.record:
+      currentWins[winner] += 1
+    for winner, loser in self.conferenceRecord:
+      currentConferenceWins[winner] += 1
+    gameTeams = np.zeros((len(self.unplayedGames), numTeams), dtype=np.float32)
+    conferenceGames = np.zeros(len(self.unplayedGames), dtype=np.float32)
+    for i, (gameCode, visitor, home) in enumerate(self.unplayedGames):
+      gameTeams[i, self.teamIndex[visitor]] += 1
+      gameTeams[i, self.teamIndex[home]] -= 1
+      conferenceGames[i] = self.isConferenceGame(visitor, home)
+    conferenceGameTeams = gameTeams * conferenceGames[:, np.newaxis]
+    self.expectedConferenceWins = currentConferenceWins + self.probabilities.dot(conferenceGameTeams) + (conferenceGameTeams < 0).sum(0)
+    playsConferenceGames = set(team for result in self.conferenceRecord for team in result)
+    playsConferenceGames.update(np.flatnonzero(np.abs(conferenceGameTeams).sum(0)))
+    conferences = dict()
+    for teamCode in self.teamCodes:
+      if self.getConference(teamCode) is not None:
+        conferences.setdefault(self.getConference(teamCode), list()).append(self.teamIndex[teamCode])
+    conferences = [np.array(teams) for teams in conferences.values() if playsConferenceGames.intersection(teams)]
+
+    splits = [numSimulations / numProcesses + (1 if i < numSimulations % numProcesses else 0) for i in range(numProcesses)]
+    jobs = [(self.probabilities, gameTeams, currentWins, conferenceGames, currentConferenceWins, conferences, splits[i], seed + i)
+            for i in range(numProcesses)]
+    if numProcesses > 1:
+      pool = Pool(numProcesses)
+      results = pool.map(simulateWins, jobs)
+      pool.close()
+      pool.join()
+    else:
+      results = map(simulateWins, jobs)
+    winCounts = sum(result[0] for result in results)
+    self.winDistribution = winCounts / float(numSimulations)
+    self.expectedWins = self.winDistribution.dot(np.arange(winCounts.shape[1]))
+    self.conferenceChampion = sum(result[1] for result in results) / numSimulations
+
+  def printStandings(self):
+    '''
+    Prints the simulated standings of every conference, ordered by
+    expected conference wins, with each team's current overall and
+    conference records, expected final wins and conference wins, most
+    likely final wins and the probability of finishing first in the
+    conference, which is left blank for conferences without a champion.
+    '''
+    record, conferenceRecord = dict(), dict()
+    for results, counts in ((self.record, record), (self.conferenceRecord, conferenceRecord)):
+      for winner, loser in results:
+        counts.setdefault(winner, [0, 0])[0] += 1
+        counts.setdefault(loser, [0, 0])[1] += 1
+    byConference = dict()
+    for teamCode in self.teamCodes:
+      byConference.setdefault(self.teamConferences.get(teamCode), list()).append(self.teamIndex[teamCode])
+    for conference, teams in sorted(byConference.items()):
+      print self.conferenceNames.get(conference, 'No conference')
+      hasChampion = any(self.conferenceChampion[team] > 0 for team in teams)
+      for team in sorted(teams, key=lambda team: (-self.expectedConferenceWins[team], -self.expectedWins[team])):
+        teamCode = self.teamCodes[team]
+        wins, losses = record.get(team, (0, 0))
+        conferenceWins, conferenceLosses = conferenceRecord.get(team, (0, 0))
+        first = "%.4f" % self.conferenceChampion[team] if hasChampion else "-"
+        print "  %-30s %2d-%-2d (%d-%d conf)  expected wins = %5.2f (%4.2f conf), most likely = %2d, first = %s" % (self.teamNames.get(teamCode, teamCode), wins, losses, conferenceWins, conferenceLosses, self.expectedWins[team], self.expectedConferenceWins[team], self.winDistribution[team].argmax(), first)
+
+  def __init__(self, year, learner):
+    '''
+    Initializes the SeasonSimulator class. Reads the season's teams and
+    played games, finds the unplayed games and their win probabilities.
+    Teams that play in the season but are missing from team.csv are
+    given no conference.
+    '''
+    self.extractor = DataExtractor(year)
+    self.teamNames, self.teamConferences = readTeams(year)
+    self.conferenceNames = readConferences(year)
+    self.teamIndex = dict()
+    self.teamCodes = list()
+    self.record = list()
+    self.conferenceRecord = list()
+    self.getPlayedGames()
+    self.unplayedGames = readUnplayedGames(year)
+    for gameCode, visitor, home in self.unplayedGames:
+      self.getTeamIndex(visitor)
+      self.getTeamIndex(home)
+    self.probabilities = self.getWinProbabilities(learner)
+
+
+
+if __name__ == '__main__':
+  import time
+  from commandLine import default, getParser, addLearnerOptions, parseOptions
+  parser = getParser()
+  parser.add_option('-y', '--year', dest='year', type='int',
+                    help=default('Season to simulate, which must have a gameUNPLAYED.csv'), default=12)
+  parser.add_option('-n', '--numSimulations', dest='numSimulations', type='int',
+                    help=default('Number of simulated seasons'), default=100000)
+  parser.add_option('-p', '--numProcesses', dest='numProcesses', type='int',
+                    help=default('Number of processes to run the simulations on'), default=1)
+  parser.add_option('-w', '--weights', dest='weights', type='string',
+                    help=default('Weights file of a trained logistic learner; trained on the earlier seasons if not given'), default=None)
+  addLearnerOptions(parser)
+
+  options, extra_args = parseOptions(parser, sys.argv[1:])
+
+  learner = StochasticGradientLearner(footballFeatureExtractor)
+  if options.weights:
+    learner.loadWeights(options.weights)
+  else:
+    train = dict()
+    for i in xrange(5, options.year):
+      train.update(DataExtractor(i).featureDictionary)
+    validation = DataExtractor(options.year).featureDictionary
+    learner.learn(train.values(), validation.values(), logisticLoss, logisticLossGradient, options)
+
+  simulator = SeasonSimulator(options.year, learner)
+  start = time.time()
+  simulator.simulate(options.numSimulations, options.numProcesses)
+  simulator.printStandings()
+  print "Simulated %d seasons of %d unplayed games in %.2f seconds" % (options.numSimulations, len(simulator.unplayedGames), time.time() - start)
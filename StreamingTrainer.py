@@ -0,0 +1,270 @@
+#
+# File: StreamingTrainer.py
+#
+# --------------------------------------------------------
+#
+# This script trains on any number of seasons without ever
+# holding them all in memory. Each season's featureDictionary
+# is written once to an example shard on disk, as a pickled
+# count followed by pickled chunks of examples. Training then
+# streams the examples back in chunk by chunk, shuffles them
+# with a bounded buffer rather than shuffling the whole list,
+# and updates the model one batch at a time, either with
+# StochasticGradientLearner.partialFit or with the partial_fit
+# of an sklearn estimator. Memory use is set by the chunk and
+# buffer sizes, not by the number of seasons. The trained model
+# is written in the formats that cfb.py loads: a weights file for
+# the learner, or a pickled (model, columns) pair otherwise.
+
+import sys, random, cPickle
+import seasonCache
+from learning import *
+from seasonData import FACTOR_FILES
+from DataExtractor import DataExtractor
+
+# Constants
+# The number of examples in each pickled chunk of a shard, which is the
+# most read into memory at once. Every shard is written with it, whichever
+# tool writes the shard first.
+SHARD_CHUNK_SIZE = 500
+STREAMING_MODELS = ['learner', 'sgd-log', 'sgd-hinge', 'perceptron']
+
+def getShard(year):
+  '''
+  Returns the path of a season's example shard, writing it from the
+  season's featureDictionary if it is missing or out of date. The
+  examples are written in game code order, SHARD_CHUNK_SIZE at a time.
+  '''
+  path = seasonCache.getCachePath(year, 'examples.pkl')
+  if seasonCache.isFresh(path, year, FACTOR_FILES):
+    return path
+  featureDictionary = DataExtractor(year).featureDictionary
+  examples = [featureDictionary[gameCode] for gameCode in sorted(featureDictionary)]
+  out = open(path, 'wb')
+  cPickle.dump(len(examples), out, 2)
+  for start in range(0, len(examples), SHARD_CHUNK_SIZE):
+    cPickle.dump(examples[start:start + SHARD_CHUNK_SIZE], out, 2)
+  out.close()
+  return path
+
+def countExamples(paths):
+  '''
+  Returns the total number of examples in a list of shards, which is
+  stored at the start of each shard.
+  '''
+  total = 0
+  for path in paths:
+    file = open(path, 'rb')
+    total += cPickle.load(file)
+    file.close()
+  return total
+
+def readShards(paths):
+  '''
+  Yields the examples of a list of shards one at a time, reading only
+  one chunk of a shard into memory at once.
+  '''
+  for path in paths:
+    file = open(path, 'rb')
+    cPickle.load(file)
+    while True:
+      try:
+        chunk = cPickle.load(file)
+      except EOFError:
+        break
+      for example in chunk:
+        yield example
+    file.close()
+
+def shuffleStream(examples, bufferSize, generator):
+  '''
+  Yields the examples in a shuffled order using a buffer of bufferSize
+  examples: once the buffer is full, each new example replaces a random
+  one, which is yielded. Examples can only move about bufferSize places
+  earlier than their position in the stream, so the shard order is also
+  shuffled each round by the caller.
+  '''
+  buffer = list()
+  for example in examples:
+    if len(buffer) < bufferSize:
+      buffer.append(example)
+      continue
+    i = generator.randrange(bufferSize)
+    yield buffer[i]
+    buffer[i] = example
+  generator.shuffle(buffer)
+  for example in buffer:
+    yield example
+
+def getColumns(x):
+  '''
+  Returns the names of the features of an input in the fixed column
+  order used for the matrices of sklearn models.
+  '''
+  return sorted(footballFeatureExtractor(x))
+
+def vectorize(examples, columns):
+  '''
+  Returns the feature matrix and label vector of examples for an sklearn
+  model, with the features in the given column order.
+  '''
+  import numpy as np
+  featureVectors = [footballFeatureExtractor(x) for x, y in examples]
+  X = np.array([[featureVector[column] for column in columns] for featureVector in featureVectors])
+  return X, np.array([y for x, y in examples])
+
+def getStreamingEstimator(name, regularization):
+  '''
+  Returns the sklearn estimator with partial_fit named by one of the
+  STREAMING_MODELS, or None for the in-house learner.
+  '''
+  if name in ('sgd-log', 'sgd-hinge'):
+    from sklearn.linear_model import SGDClassifier
+    return SGDClassifier(loss=name[4:], alpha=regularization or 0.0001)
+  elif name == 'perceptron':
+    from sklearn.linear_model import Perceptron
+    return Perceptron()
+  return None
+
+def batches(examples, batchSize):
+  '''
+  Groups a stream of examples into lists of at most batchSize examples.
+  '''
+  batch = list()
+  for example in examples:
+    batch.append(example)
+    if len(batch) == batchSize:
+      yield batch
+      batch = list()
+  if batch:
+    yield batch
+
+class StreamingTrainer:
+
+  def vectorize(self, batch):
+    '''
+    Turns a batch of examples into a matrix of features and a vector of
+    labels for an sklearn estimator, with the columns in a fixed order.
+    '''
+    if self.columns is None:
+      self.columns = getColumns(batch[0][0])
+    return vectorize(batch, self.columns)
+
+  def predictBatch(self, batch):
+    '''
+    Returns the +1/-1 predictions of the current model for a batch.
+    '''
+    if self.estimator is None:
+      return [1 if self.learner.weights*self.learner.streamFeatureExtractor(x) > 0 else -1 for x, y in batch]
+    X, y = self.vectorize(batch)
+    return self.estimator.predict(self.scaler.transform(X))
+
+  def getErrorRate(self, paths):
+    '''
+    Returns the error rate of the current model on a list of shards.
+    '''
+    numMistakes, numExamples = 0, 0
+    for batch in batches(readShards(paths), self.batchSize):
+      predictions = self.predictBatch(batch)
+      numMistakes += sum(1 for (x, y), predicted_y in zip(batch, predictions) if y != predicted_y)
+      numExamples += len(batch)
+    return 1.0 * numMistakes / numExamples
+
+  def fitScaler(self):
+    '''
+    Fits the feature scaler of an sklearn estimator in one streaming pass
+    over the training shards.
+    '''
+    for batch in batches(readShards(self.trainShards), self.batchSize):
+      self.scaler.partial_fit(self.vectorize(batch)[0])
+
+  def saveModel(self, path):
+    '''
+    Writes the trained model to path: the learner's weights file, or a
+    pickled (model, columns) pair, where model is a pipeline of the
+    fitted scaler and estimator, as cfb.py writes for its sklearn models.
+    '''
+    if self.estimator is None:
+      self.learner.saveWeights(path)
+      return
+    from sklearn.pipeline import make_pipeline
+    out = open(path, 'wb')
+    cPickle.dump((make_pipeline(self.scaler, self.estimator), self.columns), out, 2)
+    out.close()
+
+  def learn(self, lossGradient, options, modelFile=None):
+    '''
+    Makes options.numRounds passes over the training shards, each in a
+    new shuffled order, and prints the train and validation error after
+    each round. The step size of the in-house learner restarts every
+    round, as it does in StochasticGradientLearner.learn. The trained
+    model is written to modelFile, if given.
+    '''
+    generator = random.Random(42)
+    numExamples = countExamples(self.trainShards)
+    if self.estimator is not None:
+      self.fitScaler()
+    for round in range(0, options.numRounds):
+      shards = list(self.trainShards)
+      generator.shuffle(shards)
+      stream = shuffleStream(readShards(shards), self.bufferSize, generator)
+      self.learner.numUpdates = 0
+      for batch in batches(stream, self.batchSize):
+        if self.estimator is None:
+          self.learner.partialFit(batch, lossGradient, options, numExamples)
+        else:
+          X, y = self.vectorize(batch)
+          self.estimator.partial_fit(self.scaler.transform(X), y, classes=[-1, 1])
+      trainError = self.getErrorRate(self.trainShards)
+      validationError = self.getErrorRate(self.validationShards)
+      print "Round %s/%s: train error = %.4f, validation error = %.4f" % (round+1, options.numRounds, trainError, validationError)
+    if modelFile is not None:
+      self.saveModel(modelFile)
+
+  def __init__(self, trainSeasons, validationSeasons, estimator=None, bufferSize=1000, batchSize=500):
+    '''
+    Initializes the StreamingTrainer class. Writes any missing example
+    shards. If estimator is None, the in-house StochasticGradientLearner
+    is trained, otherwise estimator must be an sklearn estimator with
+    partial_fit, and its features are standardized by a scaler that is
+    fit in a streaming pass as well.
+    '''
+    self.bufferSize = bufferSize
+    self.batchSize = batchSize
+    self.trainShards = [getShard(year) for year in trainSeasons]
+    self.validationShards = [getShard(year) for year in validationSeasons]
+    self.learner = StochasticGradientLearner(footballFeatureExtractor)
+    self.estimator = estimator
+    self.columns = None
+    if estimator is not None:
+      from sklearn.preprocessing import StandardScaler
+      self.scaler = StandardScaler()
+
+
+
+if __name__ == '__main__':
+  from commandLine import default, getParser, addTrainingSeasonOptions, addLossOption, addLearnerOptions, parseOptions, parseSeasons, getLoss
+  parser = getParser()
+  addTrainingSeasonOptions(parser)
+  parser.add_option('-m', '--model', dest='model', type='string',
+                    help=default('Which model to train (learner, sgd-log, sgd-hinge or perceptron)'), default='learner')
+  parser.add_option('-b', '--bufferSize', dest='bufferSize', type='int',
+                    help=default('Number of examples in the shuffle buffer'), default=1000)
+  parser.add_option('-c', '--batchSize', dest='batchSize', type='int',
+                    help=default('Number of examples read and trained on at once'), default=500)
+  parser.add_option('-w', '--modelFile', dest='modelFile', type='string',
+                    help=default('Where to write the trained model, in the format cfb.py loads'), default=None)
+  addLossOption(parser)
+  addLearnerOptions(parser)
+
+  options, extra_args = parseOptions(parser, sys.argv[1:])
+  loss, lossGradient = getLoss(options.loss)
+
+  if options.model not in STREAMING_MODELS:
+    print "Invalid model"
+    sys.exit(1)
+  estimator = getStreamingEstimator(options.model, options.regularization)
+
+  trainer = StreamingTrainer(parseSeasons(options.trainSeasons), parseSeasons(options.validationSeasons),
+                             estimator, options.bufferSize, options.batchSize)
+  trainer.learn(lossGradient, options, options.modelFile)
@@ -0,0 +1,193 @@
+#
+# File: TeamStateStore.py
+#
+# --------------------------------------------------------
+#
+# This script keeps every team's season-to-date average stats
+# after every game it played, across all seasons, so that the
+# question "what were team X's averages as of date D" can be
+# answered without rebuilding a DataExtractor and walking its
+# lists. The snapshots come from the cumulative statistics in
+# each season's teamDictionary, dated with the game dates in
+# game.csv, and are stored in flat arrays sorted by team and
+# then by date (one row of float32 averages per snapshot).
+# A lookup for one team is a binary search of that team's
+# dates, and a lookup for every team is a single vectorized
+# binary search over (team, date) keys. The arrays are cached
+# and rebuilt when any of the seasons' data changes.
+
+import sys
+import numpy as np
+import seasonCache
+from seasonData import FACTOR_FILES
+from DataExtractor import DataExtractor
+
+# Constants
+SEASONS = range(5, 13)
+DATE_RANGE = 100000000
+
+def toDateKey(date):
+  '''
+  Converts a date given as 'mm/dd/yyyy' (as in game.csv) or as an
+  integer yyyymmdd to the integer yyyymmdd used as the store's key.
+  '''
+  if isinstance(date, str):
+    month, day, year = date.split('/')
+    return int(year) * 10000 + int(month) * 100 + int(day)
+  return int(date)
+
+def getSeason(date):
+  '''
+  Returns the number of the season a date falls in, ie. 12 for any date
+  from July 2012 through June 2013.
+  '''
+  date = toDateKey(date)
+  year, month = date / 10000, date / 100 % 100
+  return (year if month >= 7 else year - 1) - 2000
+
+def readGameDates(directory):
+  '''
+  Returns a dictionary from game codes to their dates, from game.csv.
+  '''
+  gameDates = dict()
+  file = open(directory + '/game.csv', 'r')
+  for line in file:
+    gameData = line.split(',')
+    if gameData[0][0] == '"':
+      continue
+    gameDates[gameData[0]] = toDateKey(gameData[1])
+  file.close()
+  return gameDates
+
+def buildTeamStates(seasons, path):
+  '''
+  Builds the snapshot arrays of several seasons and saves them to path.
+  A team's snapshots in a season line up with the games in the order
+  the DataExtractor processed them, which is the order of game.csv.
+  '''
+  snapshots = list()
+  stats = None
+  for year in seasons:
+    directory = str(year) + '-data'
+    extractor = DataExtractor(year)
+    gameDates = readGameDates(directory)
+    numGames = dict()
+    for gameCode, advantage in extractor.getOrderedGameList(directory):
+      for teamData in extractor.gameDictionary[gameCode]:
+        teamCode = teamData[0]
+        numGames[teamCode] = numGames.get(teamCode, 0) + 1
+        cumulative = extractor.teamDictionary[teamCode][numGames[teamCode] - 1]
+        if stats is None:
+          stats = sorted(cumulative)
+        averages = extractor.averageStats(cumulative, numGames[teamCode])
+        snapshots.append((int(teamCode), gameDates[gameCode], year, numGames[teamCode], [averages[stat] for stat in stats]))
+  snapshots.sort(key=lambda snapshot: snapshot[:2])
+  np.savez(path,
+           teams=np.array([snapshot[0] for snapshot in snapshots], dtype=np.int32),
+           dates=np.array([snapshot[1] for snapshot in snapshots], dtype=np.int32),
+           seasons=np.array([snapshot[2] for snapshot in snapshots], dtype=np.int16),
+           games=np.array([snapshot[3] for snapshot in snapshots], dtype=np.int16),
+           values=np.array([snapshot[4] for snapshot in snapshots], dtype=np.float32),
+           stats=np.array(stats))
+
+class TeamStateStore:
+
+  def getRow(self, teamCode, date, before=False):
+    '''
+    Returns the index of a team's latest snapshot as of a date in the
+    date's season, or None if it has none, so that a snapshot is never
+    one left over from an earlier season. With before set, games played
+    on the date itself are left out, which is what a preview of a game on
+    that date needs.
+    '''
+    teamCode = int(teamCode)
+    if teamCode not in self.teamRanges:
+      return None
+    start, end = self.teamRanges[teamCode]
+    i = np.searchsorted(self.dates[start:end], toDateKey(date), side='left' if before else 'right')
+    if i == 0 or self.seasons[start + i - 1] != getSeason(date):
+      return None
+    return start + i - 1
+
+  def getSnapshot(self, row):
+    state = dict(zip(self.stats, self.values[row].tolist()))
+    state['season'], state['games'], state['date'] = int(self.seasons[row]), int(self.games[row]), int(self.dates[row])
+    return state
+
+  def getState(self, teamCode, date, before=False):
+    '''
+    Returns a team's average stats as of a date as a dictionary, with
+    the 'season' and 'date' of its latest game and the number of 'games'
+    it had played that season, or None if it had not played yet in the
+    date's season.
+    '''
+    row = self.getRow(teamCode, date, before)
+    return None if row is None else self.getSnapshot(row)
+
+  def getStates(self, date, before=False):
+    '''
+    Returns a dictionary from team codes to every team's state as of a
+    date, as for getState, leaving out teams that had not played yet in
+    the date's season. The rows of all teams are found with one binary
+    search of the (team, date) keys.
+    '''
+    teams = np.array(sorted(self.teamRanges))
+    rows = np.searchsorted(self.keys, teams.astype(np.int64) * DATE_RANGE + toDateKey(date),
+                           side='left' if before else 'right') - 1
+    found = (rows >= 0) & (self.teams[np.maximum(rows, 0)] == teams)
+    found &= self.seasons[np.maximum(rows, 0)] == getSeason(date)
+    return dict((str(team), self.getSnapshot(row)) for team, row in zip(teams[found], rows[found]))
+
+  def getMatchupInput(self, firstTeam, secondTeam, date):
+    '''
+    Returns the input for a game between two teams on a date, in the
+    same form as the inputs of the DataExtractor's featureDictionary,
+    from the teams' states before that date. Returns None if either team
+    had not played yet in the date's season.
+    '''
+    input = list()
+    for teamCode in (firstTeam, secondTeam):
+      row = self.getRow(teamCode, date, before=True)
+      if row is None:
+        return None
+      input.append(dict(zip(self.stats, self.values[row].tolist())))
+    return tuple(input)
+
+  def __init__(self, seasons=SEASONS):
+    '''
+    Initializes the TeamStateStore class. Builds the snapshot arrays of
+    the seasons if they are missing or out of date, and loads them.
+    '''
+    path = seasonCache.getCachePath('_'.join(map(str, seasons)), 'teamStates.npz')
+    if not all(seasonCache.isFresh(path, year, FACTOR_FILES) for year in seasons):
+      buildTeamStates(seasons, path)
+    arrays = np.load(path)
+    self.teams, self.dates = arrays['teams'], arrays['dates']
+    self.seasons, self.games = arrays['seasons'], arrays['games']
+    self.values, self.stats = arrays['values'], list(arrays['stats'])
+    self.keys = self.teams.astype(np.int64) * DATE_RANGE + self.dates
+    self.teamRanges = dict()
+    boundaries = np.flatnonzero(np.diff(self.teams)) + 1
+    for start, end in zip(np.concatenate([[0], boundaries]), np.concatenate([boundaries, [len(self.teams)]])):
+      self.teamRanges[int(self.teams[start])] = (int(start), int(end))
+
+
+
+if __name__ == '__main__':
+  from commandLine import default, getParser, parseOptions, parseSeasons
+  parser = getParser('%prog [options] date [teamCode]')
+  parser.add_option('-s', '--seasons', dest='seasons', type='string',
+                    help=default('Comma separated seasons to keep in the store'), default=','.join(map(str, SEASONS)))
+  parser.add_option('-b', '--before', dest='before', action='store_true',
+                    help='Leave out games played on the date itself', default=False)
+
+  options, args = parseOptions(parser, sys.argv[1:], 2)
+  if len(args) == 0:
+    parser.error('Give a date (mm/dd/yyyy or yyyymmdd), and optionally a team code')
+  date = args[0] if '/' in args[0] else int(args[0])
+  store = TeamStateStore(parseSeasons(options.seasons))
+  if len(args) == 2:
+    print store.getState(args[1], date, options.before)
+  else:
+    for teamCode, state in sorted(store.getStates(date, options.before).items(), key=lambda item: int(item[0])):
+      print "%4s: season %d, %2d games through %d, %.1f points per game" % (teamCode, state['season'], state['games'], state['date'], state.get('points-off', 0))
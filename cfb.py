@@ -0,0 +1,281 @@
+#
+# File: cfb.py
+#
+# --------------------------------------------------------
+#
+# The single entry point for extracting seasons, training and
+# evaluating models, predicting games and benchmarking, ie.
+#
+#   python cfb.py extract -y 5,6,7,8,9,10,11,12
+#   python cfb.py train -t 5,6,7,8 -e 9,10,11,12
+#   python cfb.py evaluate -e 9,10,11,12
+#   python cfb.py predict -y 12 Alabama "Notre Dame"
+#   python cfb.py bench -y 100,101
+#
+# Run a command with -h for its options. Only the standard
+# library is imported up front: every command imports what it
+# needs, so NumPy and sklearn are only loaded for the commands
+# and models that use them. Commands read seasons from the
+# artifacts cached by seasonCache (example shards and team
+# averages), which are only rebuilt from the csv files when
+# the data or the factor files change, so predict does not
+# parse a season at all once the cache is warm.
+
+import sys, time
+from commandLine import default, getParser, addTrainingSeasonOptions, addLossOption, addLearnerOptions, parseOptions, parseSeasons, getLoss
+from seasonData import FACTOR_FILES, readTeams, readUnplayedGames
+
+# Constants
+COMMANDS = ['extract', 'train', 'evaluate', 'predict', 'bench']
+SKLEARN_MODELS = ['sgd-log', 'svm', 'knn', 'boosting']
+
+def addModelOptions(parser):
+  parser.add_option('-m', '--model', dest='model', type='string',
+                    help=default('Which model to use (learner, ' + ', '.join(SKLEARN_MODELS) + ')'), default='learner')
+  parser.add_option('-w', '--modelFile', dest='modelFile', type='string',
+                    help='Where the trained model is kept [Default: weights for the learner, model.pkl otherwise]', default=None)
+
+def getModelFile(options):
+  if options.modelFile:
+    return options.modelFile
+  return 'weights' if options.model == 'learner' else 'model.pkl'
+
+def loadExamples(seasons):
+  '''
+  Returns a list of the examples of several seasons, read from their
+  example shards, which are written first if they are missing.
+  '''
+  from StreamingTrainer import getShard, readShards
+  return list(readShards([getShard(year) for year in seasons]))
+
+def getSklearnModel(name):
+  from sklearn.pipeline import make_pipeline
+  from sklearn.preprocessing import StandardScaler
+  if name == 'sgd-log':
+    from sklearn.linear_model import SGDClassifier
+    classifier = SGDClassifier(loss='log')
+  elif name == 'svm':
+    from sklearn.svm import SVC
+    classifier = SVC()
+  elif name == 'knn':
+    from sklearn.neighbors import KNeighborsClassifier
+    classifier = KNeighborsClassifier(n_neighbors=3)
+  else:
+    from sklearn.ensemble import GradientBoostingClassifier
+    classifier = GradientBoostingClassifier(n_estimators=30, max_depth=3, subsample=.7)
+  return make_pipeline(StandardScaler(), classifier)
+
+def loadModel(options):
+  '''
+  Returns a function mapping a list of inputs to their +1/-1 predictions,
+  and a function mapping an input to the probability that the first team
+  wins (or None for a model without probabilities, such as the svm), for
+  the trained model named by options. The learner's features are computed
+  directly, rather than memoized by id, since the inputs are thrown away
+  as soon as they have been predicted.
+  '''
+  modelFile = getModelFile(options)
+  if options.model == 'learner':
+    from learning import StochasticGradientLearner, footballFeatureExtractor
+    learner = StochasticGradientLearner(footballFeatureExtractor)
+    learner.loadWeights(modelFile)
+    return (lambda inputs: [1 if learner.weights*footballFeatureExtractor(x) > 0 else -1 for x in inputs]), learner.predictProbability
+  import cPickle
+  from StreamingTrainer import vectorize
+  file = open(modelFile, 'rb')
+  model, columns = cPickle.load(file)
+  file.close()
+  def predictProbability(x):
+    if not hasattr(model, 'predict_proba'):
+      return None
+    probabilities = model.predict_proba(vectorize([(x, 0)], columns)[0])[0]
+    return probabilities[list(model.classes_).index(1)]
+  return (lambda inputs: model.predict(vectorize([(x, 0) for x in inputs], columns)[0])), predictProbability
+
+def getTeamAverages(year):
+  '''
+  Returns a dictionary from team codes to the team's average statistics
+  through its last game of the season, as used for the input of a game
+  that has not been played. The dictionary is cached per season.
+  '''
+  import cPickle, seasonCache
+  path = seasonCache.getCachePath(year, 'teams.pkl')
+  if seasonCache.isFresh(path, year, FACTOR_FILES):
+    file = open(path, 'rb')
+    teamAverages = cPickle.load(file)
+    file.close()
+    return teamAverages
+  from DataExtractor import DataExtractor
+  extractor = DataExtractor(year)
+  teamAverages = dict()
+  for teamCode, teamData in extractor.teamDictionary.items():
+    teamAverages[teamCode] = extractor.averageStats(teamData[-1], len(teamData))
+  out = open(path, 'wb')
+  cPickle.dump(teamAverages, out, 2)
+  out.close()
+  return teamAverages
+
+def findTeam(team, teamNames):
+  '''
+  Returns the code of a team given either its code or its name.
+  '''
+  if team in teamNames:
+    return team
+  for teamCode, name in teamNames.items():
+    if name.lower() == team.lower():
+      return teamCode
+  print "Unknown team:", team
+  sys.exit(1)
+
+def extract(args):
+  parser = getParser('%prog extract [options]')
+  parser.add_option('-y', '--seasons', dest='seasons', type='string',
+                    help=default('Comma separated seasons to extract'), default='5,6,7,8,9,10,11,12')
+  parser.add_option('-f', '--features', dest='features', action='store_true',
+                    help='Also cache the all-factor feature matrices used by FeatureSelector', default=False)
+  parser.add_option('-p', '--plays', dest='plays', action='store_true',
+                    help='Also build the play indexes', default=False)
+  options, extra_args = parseOptions(parser, args)
+  from StreamingTrainer import getShard, countExamples
+  for year in parseSeasons(options.seasons):
+    start = time.time()
+    numExamples = countExamples([getShard(year)])
+    getTeamAverages(year)
+    if options.features:
+      from FeatureSelector import loadSeasonMatrix
+      loadSeasonMatrix(year)
+    if options.plays:
+      from PlayIndex import PlayIndex
+      PlayIndex(year)
+    print "Season %d: %d examples (%.2f seconds)" % (year, numExamples, time.time() - start)
+
+def train(args):
+  parser = getParser('%prog train [options]')
+  addTrainingSeasonOptions(parser)
+  addModelOptions(parser)
+  parser.add_option('-S', '--stream', dest='stream', action='store_true',
+                    help='Stream the seasons from their shards rather than loading them into memory (learner and sgd-log only)', default=False)
+  addLossOption(parser)
+  addLearnerOptions(parser)
+  options, extra_args = parseOptions(parser, args)
+  if options.stream:
+    from StreamingTrainer import StreamingTrainer, getStreamingEstimator
+    if options.model not in ('learner', 'sgd-log'):
+      print "Only the learner and sgd-log can be trained with --stream"
+      sys.exit(1)
+    loss, lossGradient = getLoss(options.loss)
+    trainer = StreamingTrainer(parseSeasons(options.trainSeasons), parseSeasons(options.validationSeasons),
+                               getStreamingEstimator(options.model, options.regularization))
+    trainer.learn(lossGradient, options, getModelFile(options))
+    print "Wrote", getModelFile(options)
+    return
+  trainExamples = loadExamples(parseSeasons(options.trainSeasons))
+  validationExamples = loadExamples(parseSeasons(options.validationSeasons))
+  if options.model == 'learner':
+    from learning import StochasticGradientLearner, footballFeatureExtractor
+    loss, lossGradient = getLoss(options.loss)
+    learner = StochasticGradientLearner(footballFeatureExtractor)
+    learner.learn(trainExamples, validationExamples, loss, lossGradient, options, getModelFile(options))
+  elif options.model in SKLEARN_MODELS:
+    import cPickle
+    from StreamingTrainer import getColumns, vectorize
+    columns = getColumns(trainExamples[0][0])
+    model = getSklearnModel(options.model)
+    model.fit(*vectorize(trainExamples, columns))
+    for name, examples in (('train', trainExamples), ('validation', validationExamples)):
+      X, y = vectorize(examples, columns)
+      print "%s error = %.4f" % (name, (model.predict(X) != y).mean())
+    out = open(getModelFile(options), 'wb')
+    cPickle.dump((model, columns), out, 2)
+    out.close()
+  else:
+    print "Invalid model"
+    sys.exit(1)
+  print "Wrote", getModelFile(options)
+
+def evaluate(args):
+  parser = getParser('%prog evaluate [options]')
+  parser.add_option('-e', '--seasons', dest='seasons', type='string',
+                    help=default('Comma separated seasons to evaluate on'), default='9,10,11,12')
+  addModelOptions(parser)
+  options, extra_args = parseOptions(parser, args)
+  predict, predictProbability = loadModel(options)
+  for year in parseSeasons(options.seasons):
+    examples = loadExamples([year])
+    predictions = predict([x for x, y in examples])
+    numMistakes = sum(1 for (x, y), predicted_y in zip(examples, predictions) if y != predicted_y)
+    print "Season %d: error = %.4f over %d games" % (year, 1.0 * numMistakes / len(examples), len(examples))
+
+def predict(args):
+  parser = getParser('%prog predict [options] [visitingTeam homeTeam]')
+  parser.add_option('-y', '--season', dest='season', type='int',
+                    help=default('Season whose statistics to predict from'), default=12)
+  addModelOptions(parser)
+  options, teams = parseOptions(parser, args, 2)
+  teamNames = readTeams(options.season)[0]
+  if len(teams) == 2:
+    games = [tuple(findTeam(team, teamNames) for team in teams)]
+  elif len(teams) == 0:
+    games = [(visitor, home) for gameCode, visitor, home in readUnplayedGames(options.season)]
+  else:
+    parser.error('Give both a visiting and a home team, or neither to predict the unplayed games')
+  teamAverages = getTeamAverages(options.season)
+  predict, predictProbability = loadModel(options)
+  for visitor, home in games:
+    if visitor not in teamAverages or home not in teamAverages:
+      print "%s at %s: no statistics" % (teamNames.get(visitor, visitor), teamNames.get(home, home))
+      continue
+    input = (teamAverages[visitor], teamAverages[home])
+    probability = predictProbability(input)
+    if probability is None:
+      winner = visitor if predict([input])[0] > 0 else home
+      print "%s at %s: %s wins" % (teamNames.get(visitor, visitor), teamNames.get(home, home), teamNames.get(winner, winner))
+      continue
+    winner = visitor if probability > 0.5 else home
+    print "%s at %s: %s wins with probability %.3f" % (teamNames.get(visitor, visitor), teamNames.get(home, home),
+                                                        teamNames.get(winner, winner), max(probability, 1 - probability))
+
+def bench(args):
+  parser = getParser('%prog bench [options]')
+  parser.add_option('-y', '--seasons', dest='seasons', type='string',
+                    help=default('Comma separated seasons to benchmark on'), default='9,10,11,12')
+  parser.add_option('-p', '--plays', dest='plays', action='store_true',
+                    help='Also time building the play indexes', default=False)
+  addLossOption(parser)
+  addLearnerOptions(parser)
+  options, extra_args = parseOptions(parser, args)
+  from DataExtractor import DataExtractor
+  from StreamingTrainer import getShard, readShards
+  from learning import StochasticGradientLearner, footballFeatureExtractor
+  seasons = parseSeasons(options.seasons)
+  timings = list()
+  def timeStage(name, stage):
+    start = time.time()
+    result = stage()
+    timings.append((name, time.time() - start))
+    return result
+
+  timeStage('parse csv (DataExtractor)', lambda: [DataExtractor(year) for year in seasons])
+  shards = timeStage('write or check shards', lambda: [getShard(year) for year in seasons])
+  examples = timeStage('read shards', lambda: list(readShards(shards)))
+  timeStage('featurize', lambda: [footballFeatureExtractor(x) for x, y in examples])
+  learner = StochasticGradientLearner(footballFeatureExtractor)
+  loss, lossGradient = getLoss(options.loss)
+  timeStage('one partialFit round', lambda: learner.partialFit(examples, lossGradient, options, len(examples)))
+  if options.plays:
+    from PlayIndex import buildPlayIndex
+    import seasonCache
+    timeStage('build play indexes', lambda: [buildPlayIndex(year, seasonCache.getCachePath(year, 'plays.npy'),
+                                                            seasonCache.getCachePath(year, 'playOffsets.npz')) for year in seasons])
+  print "%d examples from seasons %s" % (len(examples), options.seasons)
+  for name, seconds in timings:
+    print "  %-30s %8.3f seconds  %10.0f examples/second" % (name, seconds, len(examples) / max(seconds, 1e-9))
+
+
+
+if __name__ == '__main__':
+  if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+    print "Usage: %s <command> [options], where <command> is one of: %s" % (sys.argv[0], ', '.join(COMMANDS))
+    print "Run %s <command> -h for the options of a command." % sys.argv[0]
+    sys.exit(1)
+  globals()[sys.argv[1]](sys.argv[2:])
@@ -0,0 +1,68 @@
+#
+# File: commandLine.py
+#
+# --------------------------------------------------------
+#
+# The option parsing shared by cfb.py and the scripts that can
+# be run on their own, so that the same option has the same
+# flag, name and default everywhere. Only optparse is imported
+# up front, to keep the startup of cfb.py light.
+
+import sys
+from optparse import OptionParser
+
+def default(str):
+  return str + ' [Default: %default]'
+
+def getParser(usage=None):
+  parser = OptionParser(usage=usage)
+  parser.add_option('-v', '--verbose', dest='verbose', type='int',
+                    help=default('Verbosity level'), default=0)
+  return parser
+
+def addTrainingSeasonOptions(parser):
+  parser.add_option('-t', '--trainSeasons', dest='trainSeasons', type='string',
+                    help=default('Comma separated seasons to train on'), default='5,6,7,8')
+  parser.add_option('-e', '--validationSeasons', dest='validationSeasons', type='string',
+                    help=default('Comma separated seasons to validate on'), default='9,10,11,12')
+
+def addLossOption(parser):
+  parser.add_option('-l', '--loss', dest='loss', type='string',
+                    help=default('Which loss function to use (logistic, hinge, or squared)'), default="logistic")
+
+def addLearnerOptions(parser):
+  parser.add_option('-i', '--initStepSize', dest='initStepSize', type='float',
+                    help=default('the initial step size'), default=0.00001)
+  parser.add_option('-s', '--stepSizeReduction', dest='stepSizeReduction', type='float',
+                    help=default('How much to reduce the step size [0, 1]'), default=1)
+  parser.add_option('-R', '--numRounds', dest='numRounds', type='int',
+                    help=default('Number of passes over the training data'), default=10)
+  parser.add_option('-r', '--regularization', dest='regularization', type='float',
+                    help=default('The lambda in L2 regularization'), default=0)
+
+def parseOptions(parser, args, numArgs=0):
+  '''
+  Parses args, and returns the options and at most numArgs positional
+  arguments, printing any others as ignored.
+  '''
+  options, extra_args = parser.parse_args(args)
+  if len(extra_args) > numArgs:
+    print "Ignoring extra arguments:", extra_args[numArgs:]
+  return options, extra_args[:numArgs]
+
+def parseSeasons(seasons):
+  return [int(year) for year in seasons.split(',')]
+
+def getLoss(name):
+  '''
+  Returns the (loss, lossGradient) pair of a loss function's name.
+  '''
+  import learning
+  if name == 'logistic':
+    return learning.logisticLoss, learning.logisticLossGradient
+  elif name == 'hinge':
+    return learning.hingeLoss, learning.hingeLossGradient
+  elif name == 'squared':
+    return learning.squaredLoss, learning.squaredLossGradient
+  print "Invalid loss function"
+  sys.exit(1)
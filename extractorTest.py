@@ -1,10 +1,12 @@
-from DataExtractor import *
+#
+# File: extractorTest.py
+#
+# --------------------------------------------------------
+#
+# Extracts seasons 9-11 and prints the number of examples in
+# each, ie. python cfb.py extract -y 9,10,11. Any other options
+# are passed on to cfb.py extract.
 
-data = DataExtractor(11)
-data10 = DataExtractor(10)
-data9 = DataExtractor(9)
-print len(data.featureDictionary.items())
-print len(data10.featureDictionary.items())
-data.featureDictionary.update(data10.featureDictionary)
-print len(data.featureDictionary.items())
+import sys, cfb
 
+cfb.extract(['-y', '9,10,11'] + sys.argv[1:])
@@ -2,6 +2,9 @@ import util, random, math
 from math import exp, log
 from util import Counter
 
+# The largest margin passed to exp, so that it cannot overflow.
+MAX_MARGIN = 500
+
 ############################################################
 # Feature extractors: a feature extractor should take a raw input x (tuple of
 # tokens) and add features to the featureVector (Counter) provided.
@@ -92,6 +95,9 @@ def squaredLossGradient(featureVector, y, weights):
 class StochasticGradientLearner():
   def __init__(self, featureExtractor):
     self.featureExtractor = util.memoizeById(featureExtractor)
+    self.streamFeatureExtractor = featureExtractor
+    self.weights = util.Counter()
+    self.numUpdates = 0
 
   """
   This function takes a list of training examples and performs stochastic 
@@ -115,10 +121,11 @@ class StochasticGradientLearner():
                           initStepSize / t^stepSizeReduction
      * numRounds: make this many passes over your training data
      * regularization: the 'lambda' term in L2 regularization
+  @param weightsPath: where the learned weights are written out.
   @return No return value, but you should set self.weights to be a counter with
           the new weights, after learning has finished.
   """
-  def learn(self, trainExamples, validationExamples, loss, lossGradient, options):
+  def learn(self, trainExamples, validationExamples, loss, lossGradient, options, weightsPath='weights'):
     self.weights = util.Counter()
     random.seed(42)
     initStepSize = options.initStepSize
@@ -163,10 +170,34 @@ class StochasticGradientLearner():
       print "Round %s/%s: objective = %.2f = %.2f + %.2f, train error = %.4f, validation error = %.4f" % (round+1, options.numRounds, self.objective, trainLoss, regularizationPenalty, trainError, validationError)
 
     # Print out feature weights
-    out = open('weights', 'w')
-    for f, v in sorted(self.weights.items(), key=lambda x: -x[1]):
-      print >>out, f + "\t" + str(v)
-    out.close()
+    self.saveWeights(weightsPath)
+
+  """
+  This function performs stochastic gradient descent updates on a batch of
+  training examples, in the order given, so that the examples can be streamed
+  in from disk instead of held in a list. The weights and the number of
+  updates (which sets the step size) carry over from one call to the next.
+  The features are not memoized, since streamed examples are thrown away
+  once they have been used.
+  @param examples: iterable of (input, label) training examples.
+  @param lossGradient: function that takes (x, y, weights) and returns the
+                       gradient vector as a counter.
+  @param options: the same parameters of the algorithm as for learn.
+  @param numExamples: the total number of training examples, which scales the
+                      regularization term as len(trainExamples) does in learn.
+  @return No return value, but self.weights and self.numUpdates are updated.
+  """
+  def partialFit(self, examples, lossGradient, options, numExamples):
+    regularizationScale = 1 - options.regularization/float(numExamples)
+    for x, y in examples:
+      self.numUpdates += 1
+      stepSize = options.initStepSize/(self.numUpdates**options.stepSizeReduction)
+      lossTerm = lossGradient(self.streamFeatureExtractor(x), y, self.weights)*stepSize
+      if options.regularization != 0:
+        for f in self.weights:
+          self.weights[f] *= regularizationScale
+      for f, v in lossTerm.items():
+        self.weights[f] -= v
 
   """
   Classify a new input into either +1 or -1 based on the current weights
@@ -185,6 +216,43 @@ class StochasticGradientLearner():
     else:
       return -1
 
+  """
+  The probability that the label of a new input is +1, ie. that the first
+  team wins, under a logistic model of the current weights. This is only
+  calibrated when the weights were learned with the logistic loss. The
+  features are not memoized, since the inputs (eg. matchups built on the
+  fly) are usually thrown away right after, and a memoized entry for a
+  freed input could be returned for a new one that reuses its id.
+  @param x An input example, not yet featurized.
+  @return The probability in [0, 1] that the label is +1.
+  """
+  def predictProbability(self, x):
+    margin = self.weights*self.streamFeatureExtractor(x)
+    margin = max(min(margin, MAX_MARGIN), -MAX_MARGIN)
+    return 1.0/(1 + math.exp(-margin))
+
+  """
+  Writes self.weights to a weights file, one feature and its weight per line,
+  tab separated, from the largest weight to the smallest.
+  @param path: The path of the weights file.
+  """
+  def saveWeights(self, path):
+    out = open(path, 'w')
+    for f, v in sorted(self.weights.items(), key=lambda x: -x[1]):
+      print >>out, f + "\t" + repr(v)
+    out.close()
+
+  """
+  Sets self.weights from a weights file, in the format written out by
+  saveWeights (one feature and its weight per line, tab separated).
+  @param path: The path of the weights file.
+  """
+  def loadWeights(self, path):
+    self.weights = util.Counter()
+    for line in open(path):
+      f, v = line.rstrip('\n').split('\t')
+      self.weights[f] = float(v)
+
 def setTunedOptions(options):
   options.featureExtractor = 'custom'
   options.loss = 'logistic'
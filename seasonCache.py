@@ -0,0 +1,38 @@
+#
+# File: seasonCache.py
+#
+# --------------------------------------------------------
+#
+# Helpers for the artifacts that are built from a season's
+# csv files and cached on disk, such as feature matrices and
+# example shards, so that they are only rebuilt when the
+# season's data changes.
+
+import os
+
+# Constants
+CACHE_DIRECTORY = 'cache'
+SOURCE_FILES = ['team-game-statistics.csv', 'game.csv']
+
+def getCachePath(year, name):
+  '''
+  Returns the path of a season's cached artifact, creating the cache
+  directory if needed, ie. getCachePath(12, 'features.npz') returns
+  'cache/12-features.npz'.
+  '''
+  if not os.path.exists(CACHE_DIRECTORY):
+    os.mkdir(CACHE_DIRECTORY)
+  return '%s/%s-%s' % (CACHE_DIRECTORY, year, name)
+
+def isFresh(path, year, extraFiles=()):
+  '''
+  Returns whether a cached artifact exists and is newer than the
+  season's data files it was built from, and than any extraFiles it
+  depends on, such as the factor files.
+  '''
+  if not os.path.exists(path):
+    return False
+  directory = str(year) + '-data'
+  sources = [directory + '/' + name for name in SOURCE_FILES] + list(extraFiles)
+  dataTime = max(os.path.getmtime(source) for source in sources)
+  return os.path.getmtime(path) >= dataTime
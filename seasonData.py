@@ -0,0 +1,63 @@
+#
+# File: seasonData.py
+#
+# --------------------------------------------------------
+#
+# Readers for the small tables of a season's N-data directory
+# (teams, conferences and the unplayed schedule), shared by
+# the scripts so that each table is parsed in one place and
+# every script follows the same rules, ie. a game counts as
+# played exactly when it is listed in game.csv.
+
+# Constants
+FACTOR_FILES = ['offensiveFactors', 'defensiveFactors']
+
+def readTeams(year):
+  '''
+  Returns dictionaries from team codes to team names and to conference
+  codes, from team.csv.
+  '''
+  teamNames, teamConferences = dict(), dict()
+  file = open(str(year) + '-data/team.csv', 'r')
+  for line in file:
+    teamData = line.rstrip('\r\n').split(',')
+    if teamData[0][0] == '"':
+      continue
+    teamNames[teamData[0]] = teamData[1].strip('"')
+    teamConferences[teamData[0]] = teamData[2]
+  file.close()
+  return teamNames, teamConferences
+
+def readConferences(year):
+  '''
+  Returns a dictionary from conference codes to conference names, from
+  conference.csv.
+  '''
+  conferenceNames = dict()
+  file = open(str(year) + '-data/conference.csv', 'r')
+  for line in file:
+    conferenceData = line.split(',')
+    if conferenceData[0][0] == '"':
+      continue
+    conferenceNames[conferenceData[0]] = conferenceData[1].strip('"')
+  file.close()
+  return conferenceNames
+
+def readUnplayedGames(year):
+  '''
+  Returns the (game code, visiting team, home team) triples of the games
+  listed in gameUNPLAYED.csv that are not in game.csv.
+  '''
+  directory = str(year) + '-data'
+  file = open(directory + '/game.csv', 'r')
+  playedGames = set(line.split(',')[0] for line in file)
+  file.close()
+  unplayedGames = list()
+  file = open(directory + '/gameUNPLAYED.csv', 'r')
+  for line in file:
+    gameData = line.split(',')
+    if gameData[0][0] == '"' or gameData[0] in playedGames:
+      continue
+    unplayedGames.append((gameData[0], gameData[2], gameData[3]))
+  file.close()
+  return unplayedGames